@@ -0,0 +1,87 @@
+import numpy as np
+from numba import njit
+
+@njit(cache=True)
+def _label_edges(indptr, indices, edge_ids, n, m):
+    """
+    Iterative Hopcroft-Tarjan over a CSR adjacency. Every edge gets the id of
+    the biconnected component it belongs to (self-loops stay -1).
+    """
+    disc = np.full(n, -1, np.int64)
+    low = np.zeros(n, np.int64)
+    parent_edge = np.full(n, -1, np.int64)
+    cursor = np.zeros(n, np.int64)
+    node_stack = np.empty(n, np.int64)
+    edge_stack = np.empty(m, np.int64)
+    labels = np.full(m, -1, np.int64)
+
+    time = 0
+    num_components = 0
+    edge_top = 0
+    for root in range(n):
+        if disc[root] != -1:
+            continue
+        disc[root] = time
+        low[root] = time
+        time += 1
+        cursor[root] = indptr[root]
+        node_top = 0
+        node_stack[0] = root
+
+        while node_top >= 0:
+            u = node_stack[node_top]
+            if cursor[u] < indptr[u + 1]:
+                k = cursor[u]
+                cursor[u] += 1
+                v = indices[k]
+                e = edge_ids[k]
+                if e == parent_edge[u]:
+                    continue
+                if disc[v] == -1:
+                    # Tree edge: descend into v
+                    parent_edge[v] = e
+                    disc[v] = time
+                    low[v] = time
+                    time += 1
+                    cursor[v] = indptr[v]
+                    edge_stack[edge_top] = e
+                    edge_top += 1
+                    node_top += 1
+                    node_stack[node_top] = v
+                elif disc[v] < disc[u]:
+                    # Back edge to an ancestor (seen once, from the lower end)
+                    low[u] = min(low[u], disc[v])
+                    edge_stack[edge_top] = e
+                    edge_top += 1
+            else:
+                # u is finished; close a component if its parent separates it
+                node_top -= 1
+                if node_top >= 0:
+                    p = node_stack[node_top]
+                    low[p] = min(low[p], low[u])
+                    if low[u] >= disc[p]:
+                        while True:
+                            edge_top -= 1
+                            f = edge_stack[edge_top]
+                            labels[f] = num_components
+                            if f == parent_edge[u]:
+                                break
+                        num_components += 1
+
+    return labels, num_components
+
+def biconnected_edge_labels(src: np.ndarray, dst: np.ndarray, n: int):
+    """
+    Labels the edges (src[i], dst[i]) of an undirected graph on nodes 0..n-1
+    by biconnected component. Returns (labels, num_components).
+    """
+    m = len(src)
+    # CSR adjacency: each undirected edge appears once from either end, both
+    # entries carrying the edge's id
+    heads = np.concatenate((src, dst))
+    tails = np.concatenate((dst, src))
+    edge_ids = np.concatenate((np.arange(m), np.arange(m)))
+    order = np.argsort(heads, kind="stable")
+    indptr = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(np.bincount(heads, minlength=n), out=indptr[1:])
+    return _label_edges(indptr, tails[order], edge_ids[order], n, m)
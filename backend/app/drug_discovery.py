@@ -16,6 +16,8 @@ import google.generativeai as genai
 # Load environment variables
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
 # Configure Gemini
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
 if GEMINI_API_KEY:
@@ -23,8 +25,6 @@ if GEMINI_API_KEY:
 else:
     logger.warning("GEMINI_API_KEY not found in environment variables.")
 
-logger = logging.getLogger(__name__)
-
 
 
 def smiles_to_edge_list(mol) -> str:
@@ -1,116 +1,287 @@
+import warnings
+from itertools import islice
 import networkx as nx
+import numpy as np
+from app.biconnected import biconnected_edge_labels
+from app.models import AnalyzeOut, EdgesOut, NodeOut, SubgraphOut
+from cachetools import LRUCache
 
-def analyze_graph(G: nx.Graph) -> dict:
+try:
+    # Optional (conda-only) dependency. When available, its Boost-backed
+    # planarity test is used instead of NetworkX's pure Python one.
+    import graph_tool.all as gt
+except ImportError:
+    gt = None
+
+# Per-process memo of planarity results, keyed by Weisfeiler-Lehman hash.
+# Value: list of (graph in index space, is_planar, certificate, coords)
+WL_CACHE: LRUCache = LRUCache(maxsize=1024)
+# Larger graphs skip the memo: confirming an isomorphism gets expensive
+WL_CACHE_MAX_NODES = 64
+# Entries kept per hash. 1-WL can't tell regular graphs of equal degree and
+# size apart, so without a cap one bucket collects all of them and every
+# miss pays a match attempt per entry. The oldest entry is evicted first.
+WL_BUCKET_SIZE = 4
+# Feasibility checks allowed per match attempt, per node. An attempt that
+# runs out counts as a miss.
+WL_MATCH_BUDGET = 16
+
+class _MatchBudgetExceeded(Exception):
+    pass
+
+class _BoundedMatcher(nx.isomorphism.GraphMatcher):
+    """VF2 matcher that gives up after a fixed number of feasibility checks."""
+
+    def __init__(self, G1, G2, budget: int):
+        super().__init__(G1, G2)
+        self.budget = budget
+
+    def syntactic_feasibility(self, G1_node, G2_node):
+        self.budget -= 1
+        if self.budget < 0:
+            raise _MatchBudgetExceeded
+        return super().syntactic_feasibility(G1_node, G2_node)
+
+def _find_isomorphism(G1: nx.Graph, G2: nx.Graph):
+    """Mapping G1 -> G2, or None if there is none or it wasn't found in budget."""
+    matcher = _BoundedMatcher(G1, G2, WL_MATCH_BUDGET * len(G1))
+    try:
+        return matcher.mapping if matcher.is_isomorphic() else None
+    except _MatchBudgetExceeded:
+        return None
+
+def _check_planarity_gt(G: nx.Graph, index: dict):
     """
-    Analyzes the graph for planarity and generates a layout.
-    Returns a dictionary with nodes, edges, and planarity status.
+    graph-tool version of nx.check_planarity(G, counterexample=True).
+    Returns the same shapes: a PlanarEmbedding, or the Kuratowski subgraph
+    as an nx.Graph.
     """
-    is_planar, certificate = nx.check_planarity(G, counterexample=True)
-    
-    conflict_edges = set()
+    nodes = list(G.nodes())
+    g = gt.Graph(directed=False)
+    g.add_vertex(len(nodes))
+    # Self-loops never affect planarity
+    g.add_edge_list([(index[u], index[v]) for u, v in G.edges() if u != v])
+    is_planar, embed, kuratowski = gt.is_planar(g, embedding=True, kuratowski=True)
+
+    if is_planar:
+        # embed[v] lists the indices of v's edges in embedding order
+        ends = {int(e): (int(s), int(t)) for s, t, e in g.get_edges([g.edge_index])}
+        rotation = {}
+        for v, node in enumerate(nodes):
+            rotation[node] = [nodes[t if s == v else s] for s, t in (ends[e] for e in embed[v])]
+        embedding = nx.PlanarEmbedding()
+        embedding.add_nodes_from(nodes)
+        embedding.set_data(rotation)
+        # Raises NetworkXException if the rotation system is not planar
+        embedding.check_structure()
+        return True, embedding
+
+    certificate = nx.Graph()
+    certificate.add_edges_from(
+        (nodes[int(s)], nodes[int(t)]) for s, t, on in g.get_edges([kuratowski]) if on
+    )
+    return False, certificate
+
+def _dense_counterexample(G: nx.Graph, n: int, m: int) -> nx.Graph:
+    """
+    Kuratowski subgraph of a graph with more than 3n - 6 edges. Euler's
+    bound makes such a graph non-planar for as long as it keeps more than
+    3n - 6 edges, so the surplus is dropped untested before NetworkX's
+    edge-by-edge search (one planarity test per remaining edge).
+    """
+    H = nx.Graph(G)
+    H.remove_edges_from(list(nx.selfloop_edges(H)))
+    H.remove_edges_from(list(islice(H.edges(), m - (3 * n - 5))))
+    return nx.algorithms.planarity.get_counterexample(H)
+
+def _check_planarity(G: nx.Graph, index: dict):
+    if gt is not None:
+        try:
+            return _check_planarity_gt(G, index)
+        except nx.NetworkXException as e:
+            print(f"graph-tool embedding rejected, falling back to NetworkX: {e}")
+
+    n = G.number_of_nodes()
+    # Euler's bound is on distinct undirected edges; arcs and parallel
+    # edges collapse into one for planarity
+    U = nx.Graph(G) if G.is_directed() or G.is_multigraph() else G
+    m = U.number_of_edges() - nx.number_of_selfloops(U)
+    if n > 2 and m > 3 * n - 6:
+        # Too dense to be planar, skip straight to the Kuratowski search
+        return False, _dense_counterexample(G, n, m)
+    return nx.check_planarity(G, counterexample=True)
+
+def _solve(G: nx.Graph, index: dict):
+    """
+    Runs the planarity test and layout for G. Everything is returned in
+    node-index space (see analyze_graph) so results can be relabelled:
+    (is_planar, certificate, coords), where certificate is the rotation
+    system {i: [j, ...]} for planar graphs or the Kuratowski edges [(i, j)]
+    otherwise, and coords is an (N, 2) array in index order.
+    """
+    is_planar, certificate = _check_planarity(G, index)
+
     if not is_planar:
         # certificate is the counterexample subgraph (Kuratowski subgraph)
-        for u, v in certificate.edges():
-            conflict_edges.add(tuple(sorted((u, v))))
+        certificate = [(index[u], index[v]) for u, v in certificate.edges()]
         # Use spring layout for non-planar graphs
         pos = nx.spring_layout(G, seed=42)
     else:
-        # Use planar layout for planar graphs
+        # certificate is a PlanarEmbedding object (inherits from DiGraph).
+        # Use planar layout for planar graphs, handing it the embedding so it
+        # doesn't run the planarity test a second time.
         try:
-            pos = nx.planar_layout(G)
+            pos = nx.planar_layout(certificate)
         except nx.NetworkXException:
             # Fallback if planar_layout fails for some reason (e.g. disconnected components sometimes behave oddly if not handled)
             # But planar_layout should handle disconnected graphs by laying out components.
             pos = nx.spring_layout(G, seed=42)
+        certificate = {
+            index[node]: [index[w] for w in certificate.neighbors(node)]
+            for node in certificate.nodes()
+        }
+
+    # Stack positions into one (N, 2) array so the float conversion happens in
+    # a single tolist() call instead of per node
+    coords = np.array([pos[node] for node in G.nodes()], dtype=np.float64).reshape(-1, 2)
+    return is_planar, certificate, coords
+
+def _solve_memoized(G: nx.Graph, index: dict, src: np.ndarray, dst: np.ndarray):
+    """
+    _solve, memoized per isomorphism class: inputs that describe the same
+    graph under different node labels reuse the verdict, certificate and
+    layout of the first one.
+    """
+    n = len(index)
+    if n > WL_CACHE_MAX_NODES:
+        return _solve(G, index)
+
+    H = nx.Graph()
+    H.add_nodes_from(range(n))
+    H.add_edges_from(zip(src.tolist(), dst.tolist()))
+    if nx.is_forest(H):
+        # Forests are solved in linear time, faster than any match attempt
+        return _solve(G, index)
+    with warnings.catch_warnings():
+        # NetworkX warns that unattributed hashes changed in v3.5; the keys
+        # only live in this process, so cross-version stability is moot
+        warnings.simplefilter("ignore", UserWarning)
+        key = nx.weisfeiler_lehman_graph_hash(H, iterations=3)
+
+    bucket = WL_CACHE.get(key, [])
+    for cached_graph, is_planar, certificate, coords in bucket:
+        # Equal WL hashes don't guarantee isomorphism (K3,3 and the prism
+        # collide), so reuse only once an explicit mapping is found
+        mapping = _find_isomorphism(cached_graph, H)
+        if mapping is None:
+            continue
+        perm = np.array([mapping[i] for i in range(n)], dtype=np.int64)
+        relabelled = np.empty_like(coords)
+        relabelled[perm] = coords
+        if is_planar:
+            certificate = {
+                mapping[i]: [mapping[j] for j in neighbors]
+                for i, neighbors in certificate.items()
+            }
+        else:
+            certificate = [(mapping[a], mapping[b]) for a, b in certificate]
+        return is_planar, certificate, relabelled
+
+    result = _solve(G, index)
+    WL_CACHE[key] = (bucket + [(H, *result)])[-WL_BUCKET_SIZE:]
+    return result
+
+def analyze_graph(G: nx.Graph) -> AnalyzeOut:
+    """
+    Analyzes the graph for planarity and generates a layout.
+    Returns an AnalyzeOut with nodes, edges, and planarity status.
+    """
+    # Map node ids to contiguous ints so an undirected edge can be keyed by a
+    # single packed int (min << 32 | max) instead of a sorted tuple.
+    index = {node: i for i, node in enumerate(G.nodes())}
+    node_ids = list(index)
+
+    edge_list = list(G.edges())
+    # Endpoint indices of every edge, in edge_list order
+    src = np.fromiter((index[u] for u, _ in edge_list), dtype=np.int64, count=len(edge_list))
+    dst = np.fromiter((index[v] for _, v in edge_list), dtype=np.int64, count=len(edge_list))
+
+    is_planar, certificate, coords = _solve_memoized(G, index, src, dst)
 
     # Serialize the certificate
     certificate_data = {}
+    conflict_edges = set()
     if is_planar:
         # Planar Embedding: Rotation system (neighbors in clockwise order)
-        # certificate is a PlanarEmbedding object (inherits from DiGraph)
         # We can represent it as a dict of lists
-        for node in certificate.nodes():
-            certificate_data[node] = list(certificate.neighbors(node))
+        for i, neighbors in certificate.items():
+            certificate_data[node_ids[i]] = [node_ids[j] for j in neighbors]
     else:
         # Non-Planar: Kuratowski subgraph (counterexample)
-        # certificate is a Graph object
         certificate_data = {
             "type": "Kuratowski Subgraph",
-            "edges": list(certificate.edges())
+            "edges": [(node_ids[a], node_ids[b]) for a, b in certificate]
         }
+        for a, b in certificate:
+            conflict_edges.add((a << 32) | b if a < b else (b << 32) | a)
 
-    nodes = []
-    for node in G.nodes():
-        # pos[node] is a numpy array or list [x, y]
-        x, y = pos[node]
-        # Get label if exists, else use node ID
-        label = str(G.nodes[node].get('label', node))
-        nodes.append({
-            "id": node,
-            "x": float(x),
-            "y": float(y),
-            "label": label
-        })
-        
-    edges = []
-    for u, v in G.edges():
-        # Check if this edge is in the conflict set
-        is_conflict = tuple(sorted((u, v))) in conflict_edges
-        edges.append({
-            "source": u,
-            "target": v,
-            "is_conflict": is_conflict
-        })
+    # One record per node; biconnected subgraphs reference these same objects
+    # instead of re-serializing their nodes
+    node_records = {}
+    for (node, data), (x, y) in zip(G.nodes(data=True), coords.tolist()):
+        # Get label if exists, else use node ID. The attribute dict comes
+        # straight from the data view, avoiding a G.nodes[node] lookup.
+        label = str(data.get('label', node))
+        node_records[node] = NodeOut(id=node, x=x, y=y, label=label)
+    nodes = list(node_records.values())
+
+    # Check every edge against the conflict set at once by packed key
+    packed = (np.minimum(src, dst) << 32) | np.maximum(src, dst)
+    conflict_mask = np.isin(packed, np.fromiter(conflict_edges, dtype=np.int64, count=len(conflict_edges)))
+
+    # Edges are serialized column-wise (one list per field) rather than as
+    # an object per edge
+    sources = [u for u, _ in edge_list]
+    targets = [v for _, v in edge_list]
+    edges = EdgesOut(source=sources, target=targets, is_conflict=conflict_mask.tolist())
 
     # Calculate biconnected components count and extract subgraphs
     biconnected_subgraphs = []
     try:
-        components = list(nx.biconnected_components(G))
-        num_biconnected = len(components)
-        
-        for i, comp_nodes in enumerate(components):
-            # Create subgraph
-            subgraph = G.subgraph(comp_nodes).copy()
-            
-            # Serialize subgraph nodes (keep original positions)
-            sub_nodes = []
-            for node in subgraph.nodes():
-                x, y = pos[node]
-                label = str(G.nodes[node].get('label', node))
-                sub_nodes.append({
-                    "id": node,
-                    "x": float(x),
-                    "y": float(y),
-                    "label": label
-                })
-            
-            # Serialize subgraph edges
-            sub_edges = []
-            for u, v in subgraph.edges():
-                # Check conflict in context of original graph (though subgraph might be planar itself)
-                is_conflict = tuple(sorted((u, v))) in conflict_edges
-                sub_edges.append({
-                    "source": u,
-                    "target": v,
-                    "is_conflict": is_conflict
-                })
-                
-            biconnected_subgraphs.append({
-                "id": i,
-                "nodes": sub_nodes,
-                "edges": sub_edges
-            })
-            
+        labels, num_biconnected = biconnected_edge_labels(src, dst, len(node_ids))
+
+        # Group edge ids by component label; self-loops (label -1) sort first
+        # and fall outside every component's range
+        order = np.argsort(labels, kind="stable")
+        bounds = np.searchsorted(labels, np.arange(num_biconnected + 1), sorter=order)
+
+        for i in range(num_biconnected):
+            comp_edges = order[bounds[i]:bounds[i + 1]]
+            comp_nodes = np.unique(np.concatenate((src[comp_edges], dst[comp_edges])))
+
+            # Subgraph nodes reference the records built above and edges are
+            # sliced from the main columns (keeping the original positions
+            # and conflict flags)
+            sub_nodes = [node_records[node_ids[k]] for k in comp_nodes.tolist()]
+            edge_ids = comp_edges.tolist()
+            sub_edges = EdgesOut(
+                source=[sources[e] for e in edge_ids],
+                target=[targets[e] for e in edge_ids],
+                is_conflict=conflict_mask[comp_edges].tolist()
+            )
+
+            biconnected_subgraphs.append(SubgraphOut(id=i, nodes=sub_nodes, edges=sub_edges))
+
     except Exception as e:
         print(f"Error calculating biconnected components: {e}")
         num_biconnected = 0
         biconnected_subgraphs = []
         
-    return {
-        "is_planar": is_planar,
-        "nodes": nodes,
-        "edges": edges,
-        "certificate": certificate_data,
-        "biconnected_components": num_biconnected,
-        "biconnected_subgraphs": biconnected_subgraphs
-    }
+    return AnalyzeOut(
+        is_planar=is_planar,
+        nodes=nodes,
+        edges=edges,
+        certificate=certificate_data,
+        biconnected_components=num_biconnected,
+        biconnected_subgraphs=biconnected_subgraphs
+    )
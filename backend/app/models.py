@@ -0,0 +1,32 @@
+from typing import Any, Dict, List
+import msgspec
+
+# Output of analyze_graph. msgspec encodes these straight to JSON in one
+# pass, without building intermediate dicts.
+
+class NodeOut(msgspec.Struct):
+    id: Any
+    x: float
+    y: float
+    label: str
+
+class EdgesOut(msgspec.Struct):
+    """Edges column-wise: edge i is (source[i], target[i])."""
+    source: List[Any]
+    target: List[Any]
+    is_conflict: List[bool]
+
+class SubgraphOut(msgspec.Struct):
+    id: int
+    nodes: List[NodeOut]
+    edges: EdgesOut
+
+class AnalyzeOut(msgspec.Struct):
+    is_planar: bool
+    nodes: List[NodeOut]
+    edges: EdgesOut
+    # Rotation system {node: [neighbors]} if planar, otherwise
+    # {"type": "Kuratowski Subgraph", "edges": [...]}
+    certificate: Dict[Any, Any]
+    biconnected_components: int
+    biconnected_subgraphs: List[SubgraphOut]
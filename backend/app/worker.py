@@ -1,21 +1,102 @@
 from app.parser import GraphParser
 from app.engine import analyze_graph
 import networkx as nx
+import numpy as np
+import msgspec
 import os
+from multiprocessing import resource_tracker, shared_memory
+from typing import List, Tuple, Union
+
+def _enc_hook(obj):
+    # NumPy scalars can still turn up as node ids or attributes
+    if isinstance(obj, np.generic):
+        return obj.item()
+    raise NotImplementedError(f"Objects of type {type(obj)} are not supported")
+
+# Reused across calls. Node ids can be ints (adjacency matrix, SMILES) and
+# key the planar certificate's rotation system; msgspec writes those as
+# JSON string keys.
+ENCODER = msgspec.json.Encoder(enc_hook=_enc_hook)
+
+# Encoded results at least this large go back to the parent through shared
+# memory instead of being pickled through the executor's result pipe
+SHM_THRESHOLD = 1 << 20
+
+def export_payload(payload: bytes) -> Union[bytes, Tuple[str, int]]:
+    """
+    Returns small payloads as-is. Large ones are copied into a new
+    SharedMemory block and returned as (name, length); the block is left for
+    import_payload in the parent to free.
+    """
+    if len(payload) < SHM_THRESHOLD:
+        return payload
+    shm = shared_memory.SharedMemory(create=True, size=len(payload))
+    shm.buf[:len(payload)] = payload
+    shm.close()
+    if os.name == "posix":
+        # The parent owns the block from here on. Forked workers run their
+        # own resource tracker, which would otherwise report the block as
+        # leaked at shutdown (and retry an unlink the parent already did).
+        resource_tracker.unregister(shm._name, "shared_memory")
+    return shm.name, len(payload)
+
+def import_payload(handle: Union[bytes, Tuple[str, int]]) -> bytes:
+    """Parent side of export_payload. Unlinks the shared memory block."""
+    if isinstance(handle, bytes):
+        return handle
+    name, length = handle
+    shm = shared_memory.SharedMemory(name=name)
+    try:
+        return bytes(shm.buf[:length])
+    finally:
+        shm.close()
+        shm.unlink()
+
+def _run_graph_task(input_str: str):
+    # Log process ID
+    pid = os.getpid()
+    print(f"[Process {pid}] Starting analysis for graph: {input_str[:30]}...")
+    
+    # Parse the graph
+    graph = GraphParser.parse(input_str)
+    
+    # Analyze the graph
+    return analyze_graph(graph)
 
 def process_graph_task(input_str: str):
     try:
-        # Log process ID
-        pid = os.getpid()
-        print(f"[Process {pid}] Starting analysis for graph: {input_str[:30]}...")
-        
-        # Parse the graph
-        graph = GraphParser.parse(input_str)
-        
-        # Analyze the graph
-        result = analyze_graph(graph)
-        
-        return {"status": "success", "data": result}
+        result = _run_graph_task(input_str)
+        return {"status": "success", "data": msgspec.to_builtins(result)}
     except Exception as e:
         print(f"[Process {os.getpid()}] Error: {e}")
         return {"status": "error", "message": str(e)}
+
+def warm_up() -> None:
+    """
+    Runs a tiny analysis so the worker has its imports and the compiled
+    Numba kernels loaded before the first real request arrives.
+    """
+    analyze_graph(nx.cycle_graph(3))
+
+def process_graph_task_json(input_str: str) -> bytes:
+    """
+    Same as process_graph_task, but returns the response already encoded as
+    JSON bytes. Encoding inside the worker means only a flat bytes object is
+    sent back to the parent, and the result structs are encoded directly
+    without converting them to dicts first. The return value goes through
+    export_payload; the parent reads it with import_payload.
+    """
+    try:
+        result = _run_graph_task(input_str)
+        payload = ENCODER.encode({"status": "success", "data": result})
+    except Exception as e:
+        print(f"[Process {os.getpid()}] Error: {e}")
+        payload = ENCODER.encode({"status": "error", "message": str(e)})
+    return export_payload(payload)
+
+def process_graph_batch_json(batch: List[str]) -> List[Union[bytes, Tuple[str, int]]]:
+    """
+    process_graph_task_json over several inputs in one task, so a single
+    IPC round trip carries a whole chunk of graphs.
+    """
+    return [process_graph_task_json(input_str) for input_str in batch]
@@ -1,10 +1,13 @@
 from fastapi import FastAPI, Body, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from typing import List, Dict, Any
-import hashlib
+from typing import List
+import blake3
+from cachetools import LRUCache
 import asyncio
+import os
+import sys
 from concurrent.futures import ProcessPoolExecutor
-from app.worker import process_graph_task
+from app.worker import process_graph_batch_json, import_payload, warm_up
 
 app = FastAPI()
 
@@ -24,13 +27,58 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Global cache for graph analysis results
-# Key: SHA256 hash of input string
-# Value: Result dictionary
-RESULT_CACHE: Dict[str, Any] = {}
+# Global cache for graph analysis results, LRU-evicted once the encoded
+# results exceed RESULT_CACHE_MAX_BYTES in total
+# Key: BLAKE3 digest (raw bytes) of input string
+# Value: Result envelope, already encoded as JSON bytes by the worker
+# Only touched from the event loop thread, so it needs no lock.
+RESULT_CACHE_MAX_BYTES = 256 * 1024 * 1024
+RESULT_CACHE: LRUCache = LRUCache(maxsize=RESULT_CACHE_MAX_BYTES, getsizeof=len)
 
-# Global executor
-executor = ProcessPoolExecutor()
+def physical_cores() -> int:
+    """
+    Number of physical cores this process may run on: the CPUs in its
+    affinity mask, with hyperthread siblings counted once. Falls back to the
+    logical count where the CPU topology isn't exposed (non-Linux).
+    """
+    try:
+        cpus = os.sched_getaffinity(0)
+    except AttributeError:
+        # sched_getaffinity is Linux-only
+        return os.cpu_count() or 1
+    cores = set()
+    for cpu in cpus:
+        try:
+            with open(f"/sys/devices/system/cpu/cpu{cpu}/topology/thread_siblings_list") as f:
+                cores.add(f.read().strip())
+        except OSError:
+            return len(cpus)
+    return len(cores)
+
+# Global executor, sized to physical cores: the work is CPU-bound
+# NumPy/NetworkX, so hyperthread siblings only add cache contention.
+MAX_WORKERS = max(1, physical_cores())
+
+# Every worker, including the ones that replace recycled workers, runs
+# warm_up before its first task so imports and the compiled kernels are
+# already loaded when a real graph arrives.
+executor_options = {"max_workers": MAX_WORKERS, "initializer": warm_up}
+if sys.version_info >= (3, 11):
+    # Recycle workers periodically so long-lived processes don't accumulate
+    # heap fragmentation. Each task adds at most one key to the worker's
+    # isomorphism memo, so this matches that memo's size (WL_CACHE).
+    executor_options["max_tasks_per_child"] = 1024
+executor = ProcessPoolExecutor(**executor_options)
+
+# A batch's misses are split into about CHUNKS_PER_WORKER tasks per worker
+CHUNKS_PER_WORKER = 4
+
+@app.on_event("startup")
+def startup_event():
+    # Start the workers now, so their warm_up runs before the first request
+    # instead of during it. Not awaited, startup isn't delayed.
+    for _ in range(MAX_WORKERS):
+        executor.submit(os.getpid)
 
 @app.on_event("shutdown")
 def shutdown_event():
@@ -41,7 +89,7 @@ def read_root():
     return {"Hello": "World"}
 
 from fastapi.responses import StreamingResponse
-import json
+import msgspec
 
 import time
 import logging
@@ -50,83 +98,106 @@ import logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-async def async_check_cache(h: str):
+async def async_check_cache(h: bytes):
     """Simulate an async cache lookup."""
     # In a real scenario (Redis), this would be await redis.get(h)
     # For local dict, it's instant, but we wrap it to treat it as a task.
     return RESULT_CACHE.get(h)
 
+def stamp_result(payload: bytes, duration: float, winner: str) -> bytes:
+    """
+    Splice the timing fields into an encoded result envelope without
+    decoding it. Successful results carry them inside "data", errors at the
+    top level, matching what the frontend reads.
+    """
+    fields = msgspec.json.encode({"execution_time": duration, "result_source": winner})[1:-1]
+    # The envelope is compact JSON with "data" as its last key, so the data
+    # object closes on the second-to-last byte
+    cut = -2 if payload.startswith(b'{"status":"success"') else -1
+    return payload[:cut] + b"," + fields + payload[cut:]
+
+def collect_chunk(keys: List[bytes], fut) -> List[tuple]:
+    """
+    Done-callback side of a chunk future, run in the executor's thread.
+    Copies each payload out of shared memory right away, so the segments
+    are freed even if the client has gone, and packs (hash, result, error)
+    per graph for the event loop.
+    """
+    try:
+        return [(h, import_payload(handle), None) for h, handle in zip(keys, fut.result())]
+    except Exception as e:
+        return [(h, None, e) for h in keys]
+
 @app.post("/process-batch")
 async def process_batch(inputs: List[str] = Body(...)):
     """
     Process a batch of graph strings.
     Streams results as NDJSON.
     """
-    loop = asyncio.get_running_loop()
-    
-    # Deduplicate compute tasks
-    unique_computes = {} # hash -> Future
-
-    async def race_for_input(index: int, inp: str):
-        start_time = time.time()
-        h = hashlib.sha256(inp.encode("utf-8")).hexdigest()
-        
-        # 1. Get or create compute task (Deduplicated)
-        if h not in unique_computes:
-            unique_computes[h] = loop.run_in_executor(executor, process_graph_task, inp)
-        compute_future = unique_computes[h]
-        
-        # 2. Create tasks
-        cache_task = asyncio.create_task(async_check_cache(h))
-        compute_task = asyncio.ensure_future(compute_future)
-        
-        # 3. Race them
-        # We wait for FIRST_COMPLETED.
-        # Note: compute_task is a Future from run_in_executor, which is awaitable.
-        done, pending = await asyncio.wait(
-            [cache_task, compute_task], 
-            return_when=asyncio.FIRST_COMPLETED
-        )
-        
-        res = None
-        winner = "Unknown"
-        
-        # Check if Cache won (and actually had a hit)
-        if cache_task in done:
-            res = cache_task.result()
-            if res is not None:
-                winner = "Cache"
-            else:
-                # Cache missed, so we must wait for compute
-                res = await compute_task
-                winner = "Compute"
-                # Update cache
-                RESULT_CACHE[h] = res
-        else:
-            # Compute finished first (or cache is still pending?? unlikely for local dict)
-            # If compute finished, we use it.
-            res = await compute_task
-            winner = "Compute"
-            # Update cache
-            RESULT_CACHE[h] = res
-            
-        duration = time.time() - start_time
-        logger.info(f"Graph {index}: {winner} won in {duration:.4f}s")
-        
-        if res and isinstance(res, dict):
-            if "data" in res and isinstance(res["data"], dict):
-                res["data"]["execution_time"] = duration
-                res["data"]["result_source"] = winner
-            else:
-                res["execution_time"] = duration
-                res["result_source"] = winner
+    start_time = time.time()
 
-        return json.dumps({"index": index, "result": res}) + "\n"
+    def format_line(index: int, res: bytes, winner: str) -> bytes:
+        duration = time.time() - start_time
+        logger.info(f"Graph {index}: {winner} in {duration:.4f}s")
+        # The worker already encoded the result, so the NDJSON line is
+        # assembled from bytes rather than re-serialized here
+        return b'{"index":%d,"result":' % index + stamp_result(res, duration, winner) + b"}\n"
 
     async def result_generator():
-        tasks = [race_for_input(i, inp) for i, inp in enumerate(inputs)]
-        for coro in asyncio.as_completed(tasks):
-            yield await coro
+        # Hash every input exactly once; the raw digest is used as the key for
+        # both the in-batch dedup map and RESULT_CACHE. The key only has to
+        # avoid accidental collisions, so BLAKE3 is used over SHA256 for speed.
+        hashes = [blake3.blake3(inp.encode("utf-8")).digest() for inp in inputs]
+
+        # Probe the cache first, grouping duplicate misses so they share a
+        # single compute. The misses are dispatched before any hit is
+        # written out, so workers run while the hits stream. Chunk size
+        # follows the number of misses: each round trip carries several
+        # graphs once there are many, while a few misses still go one per
+        # task. A slow graph only holds back the rest of its own chunk.
+        # Each chunk's outcomes are pushed onto a queue when it is done, so
+        # results are consumed as they arrive without re-scanning a set of
+        # pending futures.
+        loop = asyncio.get_running_loop()
+        queue = asyncio.Queue()
+        hits = []
+        misses = {} # hash -> [indices]
+        batch = []
+        for i, (inp, h) in enumerate(zip(inputs, hashes)):
+            res = await async_check_cache(h)
+            if res is not None:
+                hits.append((i, res))
+            elif h in misses:
+                misses[h].append(i)
+            else:
+                misses[h] = [i]
+                batch.append(inp)
+
+        keys = list(misses)
+        chunksize = max(1, len(keys) // (CHUNKS_PER_WORKER * MAX_WORKERS))
+        for start in range(0, len(keys), chunksize):
+            chunk_keys = keys[start:start + chunksize]
+            fut = executor.submit(process_graph_batch_json, batch[start:start + chunksize])
+            fut.add_done_callback(
+                lambda f, chunk_keys=chunk_keys: loop.call_soon_threadsafe(
+                    queue.put_nowait, collect_chunk(chunk_keys, f)
+                )
+            )
+
+        for i, res in hits:
+            yield format_line(i, res, "Cache")
+
+        remaining = len(misses)
+        while remaining:
+            for h, res, error in await queue.get():
+                if error is not None:
+                    raise error
+                # LRUCache rejects a single value larger than the whole cache
+                if len(res) <= RESULT_CACHE.maxsize:
+                    RESULT_CACHE[h] = res
+                for i in misses[h]:
+                    yield format_line(i, res, "Compute")
+                remaining -= 1
 
     return StreamingResponse(result_generator(), media_type="application/x-ndjson")
 
@@ -1,24 +1,27 @@
 import sys
 import os
 import networkx as nx
+import numpy as np
 
 # Add backend directory to path
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 
+from backend.app import engine
 from backend.app.engine import analyze_graph
+from backend.app.biconnected import biconnected_edge_labels
 
 def test_planar_graph():
     print("Testing Planar Graph (K4)...")
     G = nx.complete_graph(4)
     result = analyze_graph(G)
     
-    assert result['is_planar'] is True
-    assert len(result['nodes']) == 4
-    assert len(result['edges']) == 6
+    assert result.is_planar is True
+    assert len(result.nodes) == 4
+    assert len(result.edges.source) == 6
+    assert len(result.edges.target) == 6
     
     # Check that no edges are marked as conflict
-    for edge in result['edges']:
-        assert edge['is_conflict'] is False
+    assert result.edges.is_conflict == [False] * 6
         
     print("Planar Graph Test Passed!")
 
@@ -27,21 +30,120 @@ def test_non_planar_graph():
     G = nx.complete_graph(5)
     result = analyze_graph(G)
     
-    assert result['is_planar'] is False
-    assert len(result['nodes']) == 5
-    assert len(result['edges']) == 10
+    assert result.is_planar is False
+    assert len(result.nodes) == 5
+    assert len(result.edges.source) == 10
+    assert len(result.edges.target) == 10
     
     # Check that some edges are marked as conflict
-    conflict_count = sum(1 for edge in result['edges'] if edge['is_conflict'])
+    conflict_count = sum(result.edges.is_conflict)
     print(f"Conflict Edges Found: {conflict_count}")
     assert conflict_count > 0
     
     print("Non-Planar Graph Test Passed!")
 
+def test_directed_and_multi_graphs():
+    print("\nTesting Directed and Multi Graphs...")
+    # Arcs in both directions and parallel edges count once against
+    # Euler's 3n - 6 bound
+    tripled = nx.MultiGraph()
+    for _ in range(3):
+        tripled.add_edges_from(nx.complete_graph(4).edges())
+    graphs = [
+        nx.complete_graph(4).to_directed(),
+        nx.grid_2d_graph(3, 3).to_directed(),
+        tripled,
+    ]
+    for G in graphs:
+        assert analyze_graph(G).is_planar is True
+
+    assert analyze_graph(nx.complete_graph(5).to_directed()).is_planar is False
+
+    print("Directed and Multi Graphs Test Passed!")
+
+def test_biconnected_components():
+    print("\nTesting Biconnected Components against NetworkX...")
+    graphs = [
+        nx.barbell_graph(4, 2),
+        nx.path_graph(5),
+        nx.disjoint_union(nx.cycle_graph(4), nx.star_graph(3)),
+        nx.gnm_random_graph(40, 60, seed=7),
+    ]
+    looped = nx.cycle_graph(3)
+    looped.add_edge(1, 1)
+    graphs.append(looped)
+
+    for G in graphs:
+        edges = list(G.edges())
+        src = np.array([u for u, _ in edges], dtype=np.int64)
+        dst = np.array([v for _, v in edges], dtype=np.int64)
+        labels, count = biconnected_edge_labels(src, dst, G.number_of_nodes())
+
+        components = [set() for _ in range(count)]
+        for (u, v), label in zip(edges, labels):
+            if label >= 0:
+                components[label].update((u, v))
+
+        expected = sorted(sorted(c) for c in nx.biconnected_components(G))
+        assert sorted(sorted(c) for c in components) == expected
+
+    print("Biconnected Components Test Passed!")
+
+def test_isomorphic_memo():
+    print("\nTesting Isomorphism Memo...")
+    engine.WL_CACHE.clear()
+    # K3,3 and the triangular prism share a WL hash but only one is planar
+    assert analyze_graph(nx.complete_bipartite_graph(3, 3)).is_planar is False
+    assert analyze_graph(nx.circular_ladder_graph(3)).is_planar is True
+    assert [len(bucket) for bucket in engine.WL_CACHE.values()] == [2]
+
+    engine.WL_CACHE.clear()
+    analyze_graph(nx.complete_graph(5))
+
+    # A relabelled K5 reuses the cached result under its own node ids
+    solve = engine._solve
+    calls = []
+    engine._solve = lambda *args: calls.append(args) or solve(*args)
+    try:
+        G = nx.relabel_nodes(nx.complete_graph(5), {i: f"n{4 - i}" for i in range(5)})
+        result = analyze_graph(G)
+    finally:
+        engine._solve = solve
+    assert calls == []
+    assert [len(bucket) for bucket in engine.WL_CACHE.values()] == [1]
+
+    assert result.is_planar is False
+    assert {node.id for node in result.nodes} == set(G.nodes())
+    for u, v in result.certificate['edges']:
+        assert G.has_edge(u, v)
+    assert sum(result.edges.is_conflict) == len(result.certificate['edges'])
+
+    print("Isomorphism Memo Test Passed!")
+
+def test_memo_bucket_bound():
+    print("\nTesting Isomorphism Memo Bucket Bound...")
+    engine.WL_CACHE.clear()
+    # Cubic graphs of one size all share a WL hash
+    graphs = [nx.random_regular_graph(3, 20, seed=s) for s in range(3 * engine.WL_BUCKET_SIZE)]
+    for G in graphs:
+        analyze_graph(G)
+
+    assert len(engine.WL_CACHE) == 1
+    (bucket,) = engine.WL_CACHE.values()
+    assert len(bucket) == engine.WL_BUCKET_SIZE
+    # The newest graphs are kept
+    assert nx.is_isomorphic(bucket[-1][0], graphs[-1])
+
+    print("Isomorphism Memo Bucket Bound Test Passed!")
+
 if __name__ == "__main__":
     try:
         test_planar_graph()
         test_non_planar_graph()
+        test_directed_and_multi_graphs()
+        test_biconnected_components()
+        test_isomorphic_memo()
+        test_memo_bucket_bound()
         print("\nALL TESTS PASSED")
     except Exception as e:
         print(f"\nTEST FAILED: {e}")
@@ -0,0 +1,44 @@
+import sys
+import os
+import json
+
+# Add backend directory to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from backend.main import stamp_result
+from backend.app.worker import process_graph_task_json, import_payload
+
+def test_stamp_success():
+    print("Testing stamp_result on a success envelope...")
+    payload = import_payload(process_graph_task_json("1 2\n2 3\n3 1"))
+    line = json.loads(stamp_result(payload, 0.25, "compute"))
+
+    assert line["status"] == "success"
+    assert line["data"]["execution_time"] == 0.25
+    assert line["data"]["result_source"] == "compute"
+    assert "execution_time" not in line
+    assert line["data"]["is_planar"] is True
+    assert len(line["data"]["nodes"]) == 3
+
+    print("Success Envelope Test Passed!")
+
+def test_stamp_error():
+    print("\nTesting stamp_result on an error envelope...")
+    payload = import_payload(process_graph_task_json("[[0, 1], [1]]"))
+    line = json.loads(stamp_result(payload, 0.5, "compute"))
+
+    assert line["status"] == "error"
+    assert isinstance(line["message"], str)
+    assert line["execution_time"] == 0.5
+    assert line["result_source"] == "compute"
+
+    print("Error Envelope Test Passed!")
+
+if __name__ == "__main__":
+    try:
+        test_stamp_success()
+        test_stamp_error()
+        print("\nALL TESTS PASSED")
+    except Exception as e:
+        print(f"\nTEST FAILED: {e}")
+        sys.exit(1)
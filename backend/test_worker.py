@@ -0,0 +1,86 @@
+import sys
+import os
+import subprocess
+import textwrap
+from multiprocessing import shared_memory
+
+# Add backend directory to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from backend.app import worker
+from backend.app.worker import export_payload, import_payload
+
+def test_shared_memory_round_trip():
+    print("Testing Shared Memory Round Trip...")
+    payload = b'{"status":"success","data":' + b'7' * 4096 + b'}'
+
+    threshold = worker.SHM_THRESHOLD
+    worker.SHM_THRESHOLD = 1024
+    try:
+        handle = export_payload(payload)
+    finally:
+        worker.SHM_THRESHOLD = threshold
+
+    # Large payloads travel as (segment name, length)
+    name, length = handle
+    assert length == len(payload)
+    assert import_payload(handle) == payload
+
+    # The parent unlinks the segment once it has copied the bytes out
+    try:
+        shared_memory.SharedMemory(name=name)
+    except FileNotFoundError:
+        pass
+    else:
+        raise AssertionError(f"shared memory segment {name} was not unlinked")
+
+    # Small payloads are passed through untouched
+    assert export_payload(b'{}') == b'{}'
+    assert import_payload(b'{}') == b'{}'
+
+    print("Shared Memory Round Trip Test Passed!")
+
+def test_shared_memory_across_fork_pool():
+    print("\nTesting Shared Memory across a fork pool...")
+    # Forked workers start their own resource tracker; run the round trip in
+    # a fresh interpreter so the trackers' shutdown warnings can be checked
+    script = textwrap.dedent("""
+        import multiprocessing
+        from concurrent.futures import ProcessPoolExecutor
+        from multiprocessing import shared_memory
+        from app import worker
+        from app.worker import export_payload, import_payload
+
+        worker.SHM_THRESHOLD = 1024
+        payload = b"7" * 4096
+        context = multiprocessing.get_context("fork")
+        with ProcessPoolExecutor(2, mp_context=context) as pool:
+            for handle in pool.map(export_payload, [payload] * 20):
+                name, _ = handle
+                assert import_payload(handle) == payload
+                try:
+                    shared_memory.SharedMemory(name=name)
+                except FileNotFoundError:
+                    pass
+                else:
+                    raise AssertionError(name + " was not unlinked")
+    """)
+    proc = subprocess.run(
+        [sys.executable, "-c", script],
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+        capture_output=True,
+        text=True,
+    )
+    assert proc.returncode == 0, proc.stderr
+    assert "resource_tracker" not in proc.stderr, proc.stderr
+
+    print("Shared Memory Fork Pool Test Passed!")
+
+if __name__ == "__main__":
+    try:
+        test_shared_memory_round_trip()
+        test_shared_memory_across_fork_pool()
+        print("\nALL TESTS PASSED")
+    except Exception as e:
+        print(f"\nTEST FAILED: {e}")
+        sys.exit(1)
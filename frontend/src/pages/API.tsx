@@ -98,8 +98,8 @@ const API = () => {
                             <span className="endpoint-path">/process-batch</span>
                         </div>
                         <p style={{ marginBottom: '20px', color: 'var(--text-secondary)' }}>
-                            Submits a batch of graphs for parallel processing. The server uses a race condition between
-                            a cache lookup and a fresh computation to return the fastest result.
+                            Submits a batch of graphs for parallel processing. Each graph is looked up in the result cache first;
+                            only cache misses are computed by the worker pool, and results are streamed back as they complete.
                         </p>
 
                         <h3>Request Body</h3>
@@ -168,6 +168,8 @@ const API = () => {
                                         Contains <code>status</code> ("success" or "error") and <code>data</code>.
                                         <br />
                                         <code>data</code> includes <code>is_planar</code>, <code>nodes</code>, <code>edges</code>, and Kuratowski counts.
+                                        <br />
+                                        <code>edges</code> is column-wise: parallel <code>source</code>, <code>target</code>, and <code>is_conflict</code> arrays.
                                     </td>
                                 </tr>
                             </tbody>
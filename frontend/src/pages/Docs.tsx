@@ -50,7 +50,7 @@ const Docs = () => {
                     <section id="architecture" className="endpoint-card">
                         <h2 style={{ fontSize: '1.8rem', marginBottom: '15px' }}>System Architecture</h2>
                         <p style={{ color: 'var(--text-secondary)', marginBottom: '20px' }}>
-                            The system uses a <strong>Race-to-Result</strong> pattern to ensure low latency.
+                            The system checks the <strong>result cache first</strong> and only sends cache misses to the worker pool, streaming each result as soon as it is ready.
                         </p>
 
                         <div className="diagram-container" style={{ padding: '30px', background: 'rgba(255,255,255,0.02)', borderRadius: '8px', border: '1px solid var(--border-color)' }}>
@@ -110,24 +110,27 @@ const Docs = () => {
                                 <div style={{ position: 'absolute', top: '0', left: '70px', width: '25%', borderTop: '2px solid var(--accent-primary)' }}></div>
                                 <div style={{ position: 'absolute', top: '-10px', left: '12%', fontSize: '0.8em' }}>POST /process-batch</div>
 
-                                {/* 2. Fork */}
+                                {/* 2. Cache lookup */}
                                 <div style={{ position: 'absolute', top: '40px', left: 'calc(25% + 35px)', width: '25%', borderTop: '2px dashed #aaa' }}></div>
                                 <div style={{ position: 'absolute', top: '30px', left: '37%', fontSize: '0.8em' }}>Check Cache (Async)</div>
 
-                                <div style={{ position: 'absolute', top: '60px', left: 'calc(25% + 35px)', width: '50%', borderTop: '2px solid #aaa' }}></div>
-                                <div style={{ position: 'absolute', top: '50px', left: '50%', fontSize: '0.8em' }}>Submit Task (ProcessPool)</div>
+                                {/* 3a. Hit */}
+                                <div style={{ position: 'absolute', top: '80px', left: 'calc(25% + 35px)', width: '25%', borderTop: '2px dashed #2ecc71' }}></div>
+                                <div style={{ position: 'absolute', top: '70px', left: '37%', fontSize: '0.8em', color: '#2ecc71' }}>Hit: Result Found</div>
 
-                                {/* 3. Race */}
-                                <div style={{ position: 'absolute', top: '100px', left: 'calc(25% + 35px)', right: '0', textAlign: 'center', color: '#e74c3c', fontSize: '0.9em', fontWeight: 'bold' }}>
-                                    RACE: First Completed Wins
-                                </div>
+                                {/* 3b. Miss */}
+                                <div style={{ position: 'absolute', top: '120px', left: 'calc(25% + 35px)', width: '50%', borderTop: '2px solid #aaa' }}></div>
+                                <div style={{ position: 'absolute', top: '110px', left: '50%', fontSize: '0.8em' }}>Miss: Submit Task (ProcessPool)</div>
 
-                                {/* 4. Return */}
-                                <div style={{ position: 'absolute', top: '150px', left: 'calc(50% + 35px)', width: '25%', borderTop: '2px dashed #2ecc71' }}></div>
-                                <div style={{ position: 'absolute', top: '140px', left: '37%', fontSize: '0.8em', color: '#2ecc71' }}>Result Found (Hit)</div>
+                                <div style={{ position: 'absolute', top: '160px', left: 'calc(25% + 35px)', width: '50%', borderTop: '2px dashed #2ecc71' }}></div>
+                                <div style={{ position: 'absolute', top: '150px', left: '50%', fontSize: '0.8em', color: '#2ecc71' }}>Result Computed</div>
 
-                                <div style={{ position: 'absolute', top: '200px', left: '70px', width: '25%', borderTop: '2px solid var(--accent-primary)' }}></div>
-                                <div style={{ position: 'absolute', top: '190px', left: '12%', fontSize: '0.8em' }}>Return JSON</div>
+                                <div style={{ position: 'absolute', top: '200px', left: 'calc(25% + 35px)', width: '25%', borderTop: '2px solid #aaa' }}></div>
+                                <div style={{ position: 'absolute', top: '190px', left: '37%', fontSize: '0.8em' }}>Store</div>
+
+                                {/* 4. Return */}
+                                <div style={{ position: 'absolute', top: '250px', left: '70px', width: '25%', borderTop: '2px solid var(--accent-primary)' }}></div>
+                                <div style={{ position: 'absolute', top: '240px', left: '12%', fontSize: '0.8em' }}>Return JSON</div>
                             </div>
                         </div>
                     </section>
@@ -143,7 +146,7 @@ const Docs = () => {
                                 </li>
                                 <li style={{ marginBottom: '15px' }}>
                                     <strong>API Call</strong> (<code>main.py</code>):
-                                    <br /><span style={{ color: '#aaa', fontSize: '0.9em' }}><code>POST /process-batch</code> receives <code>List[str]</code>. It creates a SHA256 hash for each graph.</span>
+                                    <br /><span style={{ color: '#aaa', fontSize: '0.9em' }}><code>POST /process-batch</code> receives <code>List[str]</code>. It creates a BLAKE3 hash for each graph.</span>
                                 </li>
                                 <li style={{ marginBottom: '15px' }}>
                                     <strong>Execution</strong> (<code>worker.py</code>):
@@ -4,12 +4,28 @@ import GraphViz from '../components/GraphViz';
 import FileUploader from '../components/FileUploader';
 import DrugDiscoveryChat from '../components/DrugDiscoveryChat';
 
+type Edge = { source: number | string; target: number | string; is_conflict: boolean }
+
+// The backend sends edges column-wise, one array per field
+interface EdgeColumns {
+    source: Array<number | string>
+    target: Array<number | string>
+    is_conflict: boolean[]
+}
+
+const unpackEdges = (columns: EdgeColumns): Edge[] =>
+    columns.source.map((source, i) => ({
+        source,
+        target: columns.target[i],
+        is_conflict: columns.is_conflict[i]
+    }));
+
 interface Result {
     status: 'success' | 'error'
     data?: {
         is_planar: boolean
         nodes: Array<{ id: number | string; x: number; y: number; label: string }>
-        edges: Array<{ source: number | string; target: number | string; is_conflict: boolean }>
+        edges: Edge[]
         k5_count?: number
         k33_count?: number
         execution_time?: number
@@ -18,7 +34,7 @@ interface Result {
         biconnected_subgraphs?: Array<{
             id: number
             nodes: Array<{ id: number | string; x: number; y: number; label: string }>
-            edges: Array<{ source: number | string; target: number | string; is_conflict: boolean }>
+            edges: Edge[]
         }>
     }
     message?: string
@@ -138,6 +154,13 @@ const Home: React.FC = () => {
                     if (!line.trim()) continue;
                     try {
                         const data = JSON.parse(line);
+                        const graph = data.result?.data;
+                        if (graph?.edges) {
+                            graph.edges = unpackEdges(graph.edges);
+                            graph.biconnected_subgraphs?.forEach((subgraph: { edges: EdgeColumns | Edge[] }) => {
+                                subgraph.edges = unpackEdges(subgraph.edges as EdgeColumns);
+                            });
+                        }
                         setResults(prev => {
                             const newRes = [...prev];
                             newRes[data.index] = data.result;